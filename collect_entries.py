@@ -3,19 +3,27 @@
 # This code is licensed under the MIT license (see LICENSE.txt for details)
 """
 Main section of code that follows website links and extracts the pick data.
-Pick data is saved in picks.json
+Raw entry pages are saved in the tourney/pages.arc archive and the pick data
+is saved in picks.json
 """
 import os
 import re
+import html
 import time
 import json
 from datetime import datetime
 from selenium.webdriver.common.by import By
 from bs4 import BeautifulSoup
 from get_espn_driver import get_espn_driver_wrap, wait_get
+from page_archive import read_index, store_page, stream_pages, \
+    compact_archive
 
 TRAILER = "- Tournament Challenge - ESPN"
 TOURNEY = "tourney"
+TITLE_RE = re.compile(r"<title[^>]*>\s*([^<]*?)\s*" + re.escape(TRAILER)
+                      + r"\s*</title>")
+PICKS_RE = re.compile(
+    r'espn\.fantasy\.maxpart\.config\.pickString\s*=\s*"([^"]*)"')
 
 def get_root_site():
     """
@@ -28,24 +36,29 @@ def get_root_site():
     year = ldate.strftime("%Y")
     return f"{header}/{year}/en/"
 
-def handle_a_webpage(driver, page_url, filen=""):
+def fetch_webpage(driver, page_url):
     """
-    Extract the text of a website using the selenium driver
+    Load a website using the selenium driver
 
     @param driver object selenium driver
     @param page_url string webpage being operated on
-    @param filen string name of file to store data (if blank, don't store)
 
-    @return contents of webpage
+    @return bytes raw contents of webpage
     """
     driver.get(page_url)
     wait_get(4, driver, (By.ID, "main-container"))
-    wpage = driver.page_source.encode("utf-8")
-    soup = BeautifulSoup(wpage, 'html.parser')
-    if filen:
-        with open(filen, "w", encoding="utf-8") as ofile:
-            ofile.write(soup.prettify())
-    return soup
+    return driver.page_source.encode("utf-8")
+
+def handle_a_webpage(driver, page_url):
+    """
+    Extract the text of a website using the selenium driver
+
+    @param driver object selenium driver
+    @param page_url string webpage being operated on
+
+    @return contents of webpage
+    """
+    return BeautifulSoup(fetch_webpage(driver, page_url), 'html.parser')
 
 def parse_group_table(driver):
     """
@@ -60,14 +73,15 @@ def parse_group_table(driver):
 
 def save_bracket_files(driver, root_site, answer):
     """
-    Write files in the tourney directory.  Each file is a bracket entry
-    and is named by the ESPN entry number
+    Save bracket entry pages in the tourney directory archive.  Each page
+    is indexed by the ESPN entry number
 
     @param driver Object Selenium driver used
     @param root_site String URL of the parent ESPN tournament websitefi
     @param answer String link to individual user's bracket page
     """
     ginfo = root_site + answer
+    index = read_index(TOURNEY)
     handle_a_webpage(driver, ginfo)
     pcntr = driver.find_elements(By.CLASS_NAME, "navigationLink")
     for _ in range(0, len(pcntr) - 1):
@@ -79,37 +93,51 @@ def save_bracket_files(driver, root_site, answer):
                 elist.append(hrefv)
         for entry in elist:
             number = entry.split("=")[-1]
-            dfname = os.sep.join([TOURNEY, f'un1q___{number}'])
             urlv = root_site + entry
             print(f'Saving entry {number}')
-            handle_a_webpage(driver, urlv, dfname)
+            store_page(TOURNEY, index, number, fetch_webpage(driver, urlv))
         handle_a_webpage(driver, ginfo)
         xpcntr = driver.find_elements(By.CLASS_NAME, "navigationLink")
         xpcntr[-1].click()
         time.sleep(4) # kludge
+    compact_archive(TOURNEY, index)
     driver.close()
 
-def extract_pick_data():
+def gen_saved_pages():
     """
-    Collect pick data from saved files and compress that information into
-    the picks.json file
+    Generator yielding the text of every saved entry page.  Pages come from
+    the archive, followed by any loose un1q___ files left by older versions
+    for entries that are not in the archive.
+
+    @return iterator of page text strings
     """
-    pick_dict = {}
+    index = read_index(TOURNEY)
+    for _, wpage in stream_pages(TOURNEY, index):
+        yield wpage
     for entry in os.listdir(TOURNEY):
         if not entry.startswith('un1q___'):
             continue
+        if entry[len('un1q___'):] in index["entries"]:
+            continue
         infile = f'{TOURNEY}{os.sep}{entry}'
         with open(infile, "r", encoding="utf-8") as fdesc:
-            linez = fdesc.readlines()
-            tname = ''
-            for rline in linez:
-                if rline.find(TRAILER) > 0:
-                    tname = rline.split(TRAILER)[0].strip()
-                if rline.startswith("espn.fantasy.maxpart.config.pickString"):
-                    answer = rline.split("=")[-1].strip()[0:-2][1:]
-                    if len(answer) > 100:
-                        pick_dict[tname] = answer.split("|")
-                    break
+            yield fdesc.read()
+
+def extract_pick_data():
+    """
+    Collect pick data from saved pages and compress that information into
+    the picks.json file
+    """
+    pick_dict = {}
+    for wpage in gen_saved_pages():
+        tfound = TITLE_RE.search(wpage)
+        pfound = PICKS_RE.search(wpage)
+        if not tfound or not pfound:
+            continue
+        tname = html.unescape(tfound.group(1))
+        answer = pfound.group(1).strip()
+        if len(answer) > 100:
+            pick_dict[tname] = answer.split("|")
     picks_json = os.sep.join([TOURNEY, "picks.json"])
     with open(picks_json, 'w', encoding='utf-8') as pfile:
         json.dump(pick_dict, pfile, ensure_ascii=False)
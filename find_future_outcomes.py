@@ -7,6 +7,8 @@ Collect data for winning entries for every possible future outcome
 import os
 import itertools
 import json
+from configparser import ConfigParser
+from functools import partial
 from real_world import RealWorld
 from score_group import calc_scores
 from collect_entries import TOURNEY
@@ -76,16 +78,9 @@ def gen_comparisons():
         big_comp[entry] = [].copy()
         pnt_tot[entry] = 0.0
     startpts = calc_scores()
+    winners = get_winner_finder(panswers, startpts, len(all_results[0]))
     for pos_out in all_results:
-        maxv = 0
-        pkey = []
-        for indx, pansv in panswers.items():
-            pts = startpts[indx] + comp_score(pansv, pos_out)
-            if pts > maxv:
-                maxv = pts
-                pkey = [indx]
-            if pts == maxv:
-                pkey.append(indx)
+        pkey = winners(pos_out)
         for entrant in pkey:
             pnt_tot[entrant] += 1.0 / len(pkey)
             big_comp[entrant].append(pos_out)
@@ -94,6 +89,127 @@ def gen_comparisons():
         pctwinsnum[kindx] = pnt_tot[kindx]
     return consolidate(pctwinsnum, big_comp)
 
+def get_winner_finder(panswers, startpts, gms_left):
+    """
+    Select the scoring backend named by scorer in march_madness.ini.
+    'string' (the default) uses find_winners, 'bitset' uses
+    make_bits_finder, and 'check' runs both and makes sure they agree.
+
+    @param panswers dictionary list of relevant picks left, indexed by entrant
+    @param startpts dictionary points scored so far, indexed by entrant
+    @param gms_left integer number of total games left in the tournament
+    @return function taking a possible future outcome and returning the
+            list of winning entrants
+    """
+    config = ConfigParser()
+    config.read('march_madness.ini')
+    parse_info = config["DEFAULT"]
+    backend = "string"
+    if "scorer" in parse_info:
+        backend = parse_info["scorer"]
+    if backend == "string":
+        return partial(find_winners, panswers, startpts)
+    if backend not in ["bitset", "check"]:
+        raise ValueError(f"Unknown scorer: {backend}")
+    find_winners_bits = make_bits_finder(panswers, startpts, gms_left)
+    if backend == "bitset":
+        return find_winners_bits
+    def find_winners_check(pos_out):
+        pkey = find_winners(panswers, startpts, pos_out)
+        if find_winners_bits(pos_out) != pkey:
+            raise ValueError(f"Scorer mismatch on {pos_out}")
+        return pkey
+    return find_winners_check
+
+def find_winners(panswers, startpts, pos_out):
+    """
+    Find the entrants with the highest score for one possible outcome
+
+    @param panswers dictionary list of relevant picks left, indexed by entrant
+    @param startpts dictionary points scored so far, indexed by entrant
+    @param pos_out list of teams (possible future outcome)
+    @return list of winning entrants
+    """
+    maxv = 0
+    pkey = []
+    for indx, pansv in panswers.items():
+        pts = startpts[indx] + comp_score(pansv, pos_out)
+        if pts > maxv:
+            maxv = pts
+            pkey = [indx]
+        if pts == maxv:
+            pkey.append(indx)
+    return pkey
+
+def get_score_pattern(gms_left):
+    """
+    @param gms_left integer number of total games left in the tournament
+    @return list of points awarded for each of the remaining games
+    """
+    spattern = 8 * [40] + 4 * [80] + 2 * [160] + [320]
+    return spattern[-gms_left:]
+
+def make_bits_finder(panswers, startpts, gms_left):
+    """
+    Build a bit-parallel version of find_winners
+
+    Each entrant is one bit position.  For every game there is a bitset of
+    the entrants who picked each team.  Scores are kept bit-sliced: slice
+    n holds bit n of every entrant's score, so the points for a game are
+    added to all entrants who picked the winner with a few ripple-carry
+    operations.  The leaders are then found by walking the slices from
+    the top bit down and keeping the entrants who have that bit set.
+
+    @param panswers dictionary list of relevant picks left, indexed by entrant
+    @param startpts dictionary points scored so far, indexed by entrant
+    @param gms_left integer number of total games left in the tournament
+    @return function taking a possible future outcome and returning the
+            list of winning entrants
+    """
+    names = list(panswers)
+    spattern = get_score_pattern(gms_left)
+    pick_sets = [{} for _ in spattern]
+    for bit, name in enumerate(names):
+        for cnt, team in enumerate(panswers[name]):
+            pick_sets[cnt][team] = pick_sets[cnt].get(team, 0) | (1 << bit)
+    most = max([startpts[name] for name in names], default=0) + sum(spattern)
+    width = most.bit_length() + 1
+    start_slices = [0] * width
+    for bit, name in enumerate(names):
+        for pos in range(width):
+            if startpts[name] >> pos & 1:
+                start_slices[pos] |= 1 << bit
+    game_bits = []
+    for value in spattern:
+        game_bits.append([pos for pos in range(width) if value >> pos & 1])
+    everyone = (1 << len(names)) - 1
+    def find_winners_bits(pos_out):
+        slices = start_slices.copy()
+        for picked, team, vbits in zip(pick_sets, pos_out, game_bits):
+            right = picked.get(team, 0)
+            if not right:
+                continue
+            for pos in vbits:
+                carry = right
+                while carry:
+                    slices[pos], carry = slices[pos] ^ carry, slices[pos] & carry
+                    pos += 1
+        cand = everyone
+        for bslice in reversed(slices):
+            if cand & bslice:
+                cand &= bslice
+        scored = any(cand & bslice for bslice in slices)
+        pkey = []
+        while cand:
+            low = cand & -cand
+            pkey.append(names[low.bit_length() - 1])
+            cand ^= low
+        if scored:
+            # find_winners lists the first leader twice; keep that weighting
+            pkey.insert(0, pkey[0])
+        return pkey
+    return find_winners_bits
+
 def comp_score(list1, list2):
     """
     Compute future scores
@@ -104,8 +220,7 @@ def comp_score(list1, list2):
     @param list2 list of teams (possible future outcome)
     @return points scored for list1's set of picks if list2 is reality
     """
-    spattern = 8 * [40] + 4 * [80] + 2 * [160] + [320]
-    apattern = spattern[-len(list1):]
+    apattern = get_score_pattern(len(list1))
     total = 0
     for cnt, value in enumerate(apattern):
         if list1[cnt] == list2[cnt]:
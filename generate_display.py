@@ -5,6 +5,8 @@
 Generate an html page (the whole purose of this exercise)
 """
 import os
+import re
+import html
 import json
 from configparser import ConfigParser
 from real_world import RealWorld
@@ -32,46 +34,35 @@ def get_table_labels(tm_info):
     ostr += "</tr>\n"
     return ostr
 
-def add_table_sq(entry, tm_info):
+def add_table_sq(entry, abbrevs):
     """
     Fill in a cell in the next game section of the table
 
     @param dict entry this cell's data
-    @param dict tm_info team info from real_team_info
+    @param dict abbrevs team abbreviations indexed by team number
     @return String html for this cell
     """
     if len(entry) == 1:
-        tm_ind = list(entry.keys())[0]
-        sq_val = '<td  style="background-color:#000000;color:#ffffff">'
-        sq_val += tm_info[tm_ind]['abbrev'] + "</td>\n"
-        return sq_val
-    elist = []
-    evalue = []
-    for ekey in entry:
-        elist.append(ekey)
-        evalue.append(entry[ekey])
-    diffy = evalue[0] - evalue[1]
+        tm_ind = next(iter(entry))
+        return ('<td  style="background-color:#000000;color:#ffffff">'
+                f"{abbrevs[tm_ind]}</td>\n")
+    (indx, val1), (indx2, val2) = entry.items()
+    diffy = val1 - val2
     if diffy == 0:
         return "<td>*</td>"
-    indx = elist[0]
     if diffy  < 0:
-        indx = elist[1]
+        indx = indx2
         diffy = 0 - diffy
-    bcolor = get_ccode(diffy, evalue[0] + evalue[1])
-    retv = f'<td style="background-color:{bcolor}">'
-    retv += tm_info[indx]['abbrev'] + "</td>\n"
-    return retv
+    bcolor = get_ccode(diffy, val1 + val2)
+    return f'<td style="background-color:{bcolor}">{abbrevs[indx]}</td>\n'
 
-def get_ccode(diffy, total):
+def icol_ccode(icol):
     """
-    Get the style color for a square on the table
+    Convert a color offset into a style color code
 
-    @param integer diffy difference between two team choices
-    @param integer total total number of winning combinations
+    @param integer icol color offset (0 to 512)
     @return RBG color code
     """
-    coloff = 512 * diffy / total
-    icol = int(coloff + .5)
     if icol < 256:
         red = icol
         green = 255
@@ -80,50 +71,121 @@ def get_ccode(diffy, total):
         green = max(511 - icol, 0)
     return f'#{red:02x}{green:02x}00'
 
-def get_table_body(user_data, tm_info):
+CCODES = [icol_ccode(icol) for icol in range(513)]
+
+def get_ccode(diffy, total):
     """
-    Wrapper to generate the table displayed
+    Get the style color for a square on the table
 
+    @param integer diffy difference between two team choices
+    @param integer total total number of winning combinations
+    @return RBG color code
+    """
+    return CCODES[int(512 * diffy / total + .5)]
+
+def get_table_row(name, udata, abbrevs):
+    """
+    Generate one row of the table
+
+    @param name String entrant name
+    @param udata dictionary this entrant's data from leaders.json
+    @param abbrevs dictionary team abbreviations indexed by team number
+    @return string of html code for this entrant
+    """
+    cells = [f"<tr><td>{html.escape(name)}</td><td>{udata['wins']}</td>",
+             f"<td>{udata['pct']:10.5f}</td>"]
+    for entry in udata['next_round']:
+        cells.append(add_table_sq(entry, abbrevs))
+    cells.append("</tr>\n")
+    return "".join(cells)
+
+def write_table_body(mfile, names, user_data, abbrevs):
+    """
+    Write the rows of the table one at a time
+
+    @param mfile file object html file being written
+    @param names list entrant names to display on this page
     @param user_data dictionary extracted from leaders.json
-    @param tm_info dictionary from real_team_info so that numbers
-           can be replaced by team names or abbreviations
-
-    @return string of html code filling in the body of the table
-    """
-    ostr = ""
-    for name in user_data:
-        ostr += "<tr><td>" + name + "</td><td>"
-        ostr += str(user_data[name]['wins']) + "</td><td>"
-        pvalue = user_data[name]["pct"]
-        ostr += f'{pvalue:10.5f}' + "</td>"
-        for entry in user_data[name]['next_round']:
-            ostr += add_table_sq(entry, tm_info)
-        ostr += "<tr>\n"
-    return ostr
+    @param abbrevs dictionary team abbreviations indexed by team number
+    """
+    for name in names:
+        mfile.write(get_table_row(name, user_data[name], abbrevs))
+
+def get_page_name(pnumb):
+    """
+    @param pnumb integer page number (starting at 1)
+    @return String name of html file for this page
+    """
+    if pnumb == 1:
+        return "NCAA_madness.html"
+    return f"NCAA_madness_{pnumb}.html"
+
+def get_page_links(pnumb, pcount):
+    """
+    Generate links to the other pages of a split up display
+
+    @param pnumb integer number of the page being written
+    @param pcount integer total number of pages
+    @return string of html code (empty if there is only one page)
+    """
+    if pcount == 1:
+        return ""
+    links = []
+    for indx in range(1, pcount + 1):
+        if indx == pnumb:
+            links.append(str(indx))
+        else:
+            links.append(f'<a href="{get_page_name(indx)}">{indx}</a>')
+    return "<br><p>Page " + " ".join(links) + "</p>\n"
+
+def remove_old_pages(pcount):
+    """
+    Remove pages left over from an earlier run that used more pages
+
+    @param pcount integer number of pages being written this time
+    """
+    for fname in os.listdir(TOURNEY):
+        found = re.fullmatch(r"NCAA_madness_(\d+)\.html", fname)
+        if found and int(found.group(1)) > pcount:
+            os.remove(os.sep.join([TOURNEY, fname]))
 
 def generate_display():
     """
     Generate an html file based on the data in leaders.json
 
-    Produces NCAA_madness.html file
+    Produces NCAA_madness.html file.  If page_size is set in
+    march_madness.ini, entrants are split among NCAA_madness.html,
+    NCAA_madness_2.html, ... with page_size entrants per page.
     """
     leaders = os.sep.join([TOURNEY, "leaders.json"])
     with open(leaders, 'r', encoding='utf-8') as ofile:
         user_data = json.load(ofile)
     rwobj = RealWorld()
     tm_info = rwobj.real_team_info
-    with open("header.txt", 'r', encoding="utf-8") as hfile:
-        header = hfile.read()
-    table_labels = get_table_labels(tm_info)
-    table_body = get_table_body(user_data, tm_info)
-    trailer = "</table></center></body></html>"
-    out_string = header + table_labels + table_body + trailer
+    abbrevs = {tm_ind: tm_info[tm_ind]['abbrev'] for tm_ind in tm_info}
     config = ConfigParser()
     config.read('march_madness.ini')
-    title = config["DEFAULT"]["group"].replace("_", " ")
-    madness = os.sep.join([TOURNEY, "NCAA_madness.html"])
-    with open(madness, "w", encoding="utf-8") as mfile:
-        mfile.write(out_string % (title, title))
+    parse_info = config["DEFAULT"]
+    title = parse_info["group"].replace("_", " ")
+    with open("header.txt", 'r', encoding="utf-8") as hfile:
+        header = hfile.read() % (title, title)
+    header += get_table_labels(tm_info)
+    trailer = "</table>\n"
+    names = list(user_data)
+    psize = parse_info.getint("page_size", 0)
+    if psize <= 0:
+        psize = max(len(names), 1)
+    pcount = max((len(names) + psize - 1) // psize, 1)
+    remove_old_pages(pcount)
+    for pnumb in range(1, pcount + 1):
+        madness = os.sep.join([TOURNEY, get_page_name(pnumb)])
+        with open(madness, "w", encoding="utf-8") as mfile:
+            mfile.write(header)
+            write_table_body(mfile, names[(pnumb - 1) * psize:pnumb * psize],
+                             user_data, abbrevs)
+            mfile.write(trailer)
+            mfile.write(get_page_links(pnumb, pcount))
+            mfile.write("</center></body></html>")
 
 if __name__ == "__main__":
     generate_display()
@@ -0,0 +1,165 @@
+# (c) 2022 Warren Usui
+# Collect pick data from an ESPN NCAA Tournament group
+# This code is licensed under the MIT license (see LICENSE.txt for details)
+"""
+Store raw entry pages in a single compressed, append-only archive.
+
+Each record is a one line header (content hash, entry number, payload
+length) followed by the zlib compressed page.  A page whose hash is already
+in the archive is written as a header with a zero length payload that
+refers back to the earlier copy.  Re-saving an unchanged entry writes
+nothing.  Once pages that have been replaced take up more than half of the
+file, compact_archive rewrites it with only the latest page of each entry.
+"""
+import os
+import zlib
+import hashlib
+
+ARCHIVE = "pages.arc"
+
+def read_header(header):
+    """
+    Parse a record header
+
+    @param header bytes header line read from the archive
+    @return tuple (hash, entry number, payload length), or None if the
+            header is damaged
+    """
+    if not header.endswith(b"\n"):
+        return None
+    try:
+        digest, entry_id, length = header.decode("ascii").split()
+        return digest, entry_id, int(length)
+    except ValueError:
+        return None
+
+def read_index(arc_dir):
+    """
+    Scan the record headers in the archive (payloads are skipped).  Scanning
+    stops at the first damaged or cut off record, which is left out of the
+    index and is overwritten by the next store_page call.
+
+    @param arc_dir String directory holding the archive
+    @return dictionary with three entries: 'entries' maps each entry number
+            to the hash of its latest page, 'blobs' maps each hash to the
+            (offset, length) of its compressed payload, and 'end' is the
+            offset where the next record is written
+    """
+    index = {"entries": {}, "blobs": {}, "end": 0}
+    arc_file = os.sep.join([arc_dir, ARCHIVE])
+    if not os.path.exists(arc_file):
+        return index
+    arc_size = os.path.getsize(arc_file)
+    with open(arc_file, "rb") as afile:
+        while index["end"] < arc_size:
+            record = read_header(afile.readline())
+            if record is None:
+                break
+            digest, entry_id, length = record
+            offset = afile.tell()
+            if offset + length > arc_size:
+                break
+            if length:
+                index["blobs"][digest] = (offset, length)
+                afile.seek(length, os.SEEK_CUR)
+            elif digest not in index["blobs"]:
+                break
+            index["entries"][entry_id] = digest
+            index["end"] = offset + length
+    return index
+
+def store_page(arc_dir, index, entry_id, wpage):
+    """
+    Append a page to the archive unless it is unchanged
+
+    @param arc_dir String directory holding the archive
+    @param index dictionary from read_index (updated in place)
+    @param entry_id String ESPN entry number
+    @param wpage bytes raw contents of the webpage
+    @return True if a record was appended
+    """
+    digest = hashlib.sha256(wpage).hexdigest()
+    if index["entries"].get(entry_id) == digest:
+        return False
+    payload = b""
+    if digest not in index["blobs"]:
+        payload = zlib.compress(wpage, 9)
+    header = get_header(digest, entry_id, len(payload))
+    arc_file = os.sep.join([arc_dir, ARCHIVE])
+    with open(arc_file, "ab") as afile:
+        afile.truncate(index["end"])
+        afile.write(header + payload)
+    if payload:
+        index["blobs"][digest] = (index["end"] + len(header), len(payload))
+    index["entries"][entry_id] = digest
+    index["end"] += len(header) + len(payload)
+    return True
+
+def get_header(digest, entry_id, length):
+    """
+    @param digest String hash of the page
+    @param entry_id String ESPN entry number
+    @param length integer length of the compressed payload
+    @return bytes record header
+    """
+    return f"{digest} {entry_id} {length}\n".encode("ascii")
+
+def compact_archive(arc_dir, index, share=.5):
+    """
+    Rewrite the archive keeping only the latest page of each entry, if
+    replaced pages take up more than share of the file
+
+    @param arc_dir String directory holding the archive
+    @param index dictionary from read_index (updated in place)
+    @param share float fraction of the file that may be replaced pages
+    @return True if the archive was rewritten
+    """
+    live_size = 0
+    live_blobs = set()
+    for entry_id, digest in index["entries"].items():
+        length = 0
+        if digest not in live_blobs:
+            live_blobs.add(digest)
+            length = index["blobs"][digest][1]
+        live_size += len(get_header(digest, entry_id, length)) + length
+    if index["end"] - live_size <= share * index["end"]:
+        return False
+    arc_file = os.sep.join([arc_dir, ARCHIVE])
+    new_file = arc_file + ".new"
+    blobs = {}
+    with open(arc_file, "rb") as afile, open(new_file, "wb") as nfile:
+        for entry_id, digest in index["entries"].items():
+            payload = b""
+            if digest not in blobs:
+                offset, length = index["blobs"][digest]
+                afile.seek(offset)
+                payload = afile.read(length)
+            header = get_header(digest, entry_id, len(payload))
+            if payload:
+                blobs[digest] = (nfile.tell() + len(header), len(payload))
+            nfile.write(header + payload)
+        end = nfile.tell()
+    os.replace(new_file, arc_file)
+    index["blobs"] = blobs
+    index["end"] = end
+    return True
+
+def stream_pages(arc_dir, index=None):
+    """
+    Generator yielding the latest page saved for every entry
+
+    @param arc_dir String directory holding the archive
+    @param index dictionary from read_index (read if not passed)
+    @return iterator of (entry number, page text) tuples
+    """
+    if index is None:
+        index = read_index(arc_dir)
+    if not index["entries"]:
+        return
+    arc_file = os.sep.join([arc_dir, ARCHIVE])
+    with open(arc_file, "rb") as afile:
+        for entry_id, digest in index["entries"].items():
+            offset, length = index["blobs"][digest]
+            afile.seek(offset)
+            wpage = zlib.decompress(afile.read(length))
+            yield entry_id, wpage.decode("utf-8")